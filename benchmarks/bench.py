@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""Microbenchmarks for the rfidpad custom component.
+
+Runs the component against the stand-ins in ha_stubs, so no Home Assistant
+installation is needed. Usage, from the repository root:
+
+    python benchmarks/bench.py                  # run and compare to baseline
+    python benchmarks/bench.py --save-baseline  # run and store a new baseline
+
+Each benchmark is calibrated so that one repeat takes at least MIN_TIME,
+and the fastest time per call over REPEAT interleaved repeats is reported.
+Baseline comparisons use the time relative to a fixed reference workload. The results
+of every run are written to benchmarks/results.json. When a baseline
+exists, the run fails if any benchmark got slower than the baseline by more
+than --max-slowdown.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import ha_stubs
+
+ha_stubs.install()
+
+from custom_components import rfidpad
+from custom_components.rfidpad.const import CONF_TAGS, DOMAIN
+from custom_components.rfidpad.sensor import (
+    BatteryForecastSensor,
+    BatterySensor,
+    LastTagSensor,
+)
+
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+RESULTS_FILE = os.path.join(BENCH_DIR, "results.json")
+
+TAGS = {f"{i:08X}": f"User {i}" for i in range(20)}
+
+FULL_DISCOVERY = {
+    "id": "0123456789ab",
+    "name": "Front door",
+    "model": "RFIDPad",
+    "manufacturer": "Jan-Pascal van Best",
+    "sw_version": "0.1",
+    "base_topic": "rfidpad/0123456789ab",
+    "status_topic": "status",
+    "action_topic": "action",
+    "battery_topic": "battery",
+    "encoding": "json",
+}
+
+MINIMAL_DISCOVERY = {
+    "id": "0123456789ab",
+    "name": "Front door",
+}
+
+
+def make_hass():
+    hass = ha_stubs.FakeHass()
+    hass.data[DOMAIN] = {CONF_TAGS: TAGS}
+    return hass
+
+
+def make_handler(history_size=0, pads=1):
+    """Return a handler with the given history size and started pads."""
+    hass = make_hass()
+    handler = rfidpad.RFIDPadHandler(hass, None, "rfidpad")
+    handler.async_add_devices["sensor"] = lambda devices: None
+    for i in range(pads):
+        config = dict(FULL_DISCOVERY, id=f"pad{i}", name=f"Pad {i}")
+        pad = rfidpad.RFIDPad(hass, handler, config)
+        pad.battery_sensor = BatterySensor(hass, pad)
+        pad.battery_forecast_sensor = BatteryForecastSensor(hass, pad)
+        pad.last_tag_sensor = LastTagSensor(hass, pad)
+        handler.devices[pad.id] = pad
+    pad = next(iter(handler.devices.values()))
+    action = rfidpad.RFIDAction(pad, "ARM_AWAY", "00000001")
+    handler._history = [action.as_dict() for _ in range(history_size)]
+    pad.last_action = action
+    return handler, pad
+
+
+MIN_TIME = 0.1
+REPEAT = 9
+
+
+def _without_gc(func):
+    gc.collect()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return func()
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+class Timer:
+    """Times number calls of func() with the garbage collector disabled."""
+
+    def __init__(self, func):
+        self.func = func
+        self.number = None
+
+    def _loop(self, number):
+        func = self.func
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - start
+
+    def run(self, number):
+        """Return the elapsed time of number calls."""
+        return _without_gc(lambda: self._loop(number))
+
+    def calibrate(self):
+        """Warm up, then find a number of calls that takes at least MIN_TIME.
+
+        Like timeit.Timer.autorange.
+        """
+        self.run(1)
+        number = 1
+        while True:
+            elapsed = self.run(number)
+            if elapsed >= MIN_TIME:
+                break
+            number *= max(2, min(10, int(MIN_TIME / max(elapsed, 1e-9)) + 1))
+        self.number = number
+
+    def sample(self):
+        """Return the time per call of one calibrated run, in seconds."""
+        return self.run(self.number) / self.number
+
+
+class AsyncTimer(Timer):
+    """Times number awaits of coro_func() on a fresh event loop."""
+
+    async def _awaits(self, number):
+        coro_func = self.func
+        start = time.perf_counter()
+        for _ in range(number):
+            await coro_func()
+        return time.perf_counter() - start
+
+    def _loop(self, number):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self._awaits(number))
+        finally:
+            loop.close()
+
+
+def bench_action_as_dict():
+    handler, pad = make_handler()
+    action = pad.last_action
+    return {"action_as_dict": Timer(action.as_dict)}
+
+
+def _handle_action_timer(history_size):
+    handler, pad = make_handler(history_size, pads=5)
+    action = rfidpad.RFIDAction(pad, "ARM_AWAY", "00000001")
+
+    async def handle_action():
+        await handler.async_handle_action(action)
+        # Keep the history at history_size for every call
+        del handler._history[history_size:]
+
+    return AsyncTimer(handle_action)
+
+
+def bench_handle_action():
+    return {
+        f"handle_action[history={history_size}]": _handle_action_timer(history_size)
+        for history_size in (0, 1000, 10000)
+    }
+
+
+def _last_tag_attributes_timer(history_size):
+    handler, pad = make_handler(history_size)
+    sensor = LastTagSensor(handler.hass, pad)
+    return Timer(lambda: sensor.device_state_attributes)
+
+
+def bench_last_tag_attributes():
+    return {
+        f"last_tag_attributes[history={history_size}]":
+            _last_tag_attributes_timer(history_size)
+        for history_size in (99, 1000)
+    }
+
+
+def bench_pad_init():
+    handler, pad = make_handler()
+    hass = handler.hass
+    return {
+        "pad_init[full]": Timer(
+            lambda: rfidpad.RFIDPad(hass, handler, FULL_DISCOVERY)
+        ),
+        "pad_init[minimal]": Timer(
+            lambda: rfidpad.RFIDPad(hass, handler, MINIMAL_DISCOVERY)
+        ),
+    }
+
+
+def bench_data_to_save():
+    handler, pad = make_handler(1000, pads=20)
+    for telemetry in handler._battery_telemetry.values():
+        for hour in range(0, 24 * 30, 6):
+            telemetry.add_sample(hour * 3600, 4.2 - hour * 0.0005)
+    return {"data_to_save": Timer(handler._data_to_save)}
+
+
+def bench_setup_entry():
+    """Time async_setup_entry until 20 buffered pads have been discovered."""
+    discovery = [
+        ha_stubs.FakeMessage(
+            f"rfidpad/discovery/pad{i}",
+            json.dumps(dict(FULL_DISCOVERY, id=f"pad{i}", name=f"Pad {i}")),
+        )
+        for i in range(20)
+    ]
+
+    async def setup():
+        hass = make_hass()
+        entry = ha_stubs.FakeConfigEntry("entry", {"mqtt_prefix": "rfidpad"})
+        await rfidpad.async_setup_entry(hass, entry)
+        receive_discovery = ha_stubs.mqtt.subscriptions["rfidpad/discovery/#"]
+        for msg in discovery:
+            await receive_discovery(msg)
+        await asyncio.gather(*hass.tasks)
+        handler = hass.data[DOMAIN]["entry"]
+        assert handler.setup_time is not None
+        assert len(handler.devices) == len(discovery)
+
+    return {"setup_entry[pads=20]": AsyncTimer(setup)}
+
+
+def _reference():
+    """Fixed pure Python workload used to correct for the machine's speed."""
+    values = {str(i): i for i in range(200)}
+    return sorted(f"{key}={value}" for key, value in values.items())
+
+
+BENCHMARKS = [
+    bench_action_as_dict,
+    bench_handle_action,
+    bench_last_tag_attributes,
+    bench_pad_init,
+    bench_data_to_save,
+    bench_setup_entry,
+]
+
+
+def run_benchmarks(selected=None):
+    """Run the benchmarks and return their results.
+
+    Returns a dict with the fastest time per call of each benchmark in
+    seconds, and its median time relative to the reference workload. The
+    reference is sampled right before every sample of a benchmark, so the
+    relative times hardly depend on how fast the machine is at the moment.
+    The repeats of all benchmarks are interleaved as well.
+    """
+    reference = Timer(_reference)
+    timers = {}
+    for bench in BENCHMARKS:
+        if selected and not any(name in bench.__name__ for name in selected):
+            continue
+        timers.update(bench())
+
+    reference.calibrate()
+    for timer in timers.values():
+        timer.calibrate()
+
+    seconds = {name: [] for name in timers}
+    relative = {name: [] for name in timers}
+    for _ in range(REPEAT):
+        for name, timer in timers.items():
+            reference_time = reference.sample()
+            sample = timer.sample()
+            seconds[name].append(sample)
+            relative[name].append(sample / reference_time)
+
+    return {
+        "seconds": {name: min(times) for name, times in seconds.items()},
+        "relative": {name: statistics.median(times) for name, times in relative.items()},
+    }
+
+
+def compare(results, baseline, max_slowdown):
+    """Print a comparison with the baseline and return the regressions."""
+    regressions = []
+    baseline = baseline.get("relative", {})
+    for name, seconds in results["seconds"].items():
+        line = f"{name:45} {seconds * 1e6:12.3f} us"
+        if name in baseline:
+            ratio = results["relative"][name] / baseline[name]
+            line += f"  {ratio:6.2f}x baseline"
+            if ratio > max_slowdown:
+                line += "  SLOWER"
+                regressions.append(name)
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("benchmarks", nargs="*",
+            help="only run benchmarks whose name contains one of these strings")
+    parser.add_argument("--save-baseline", action="store_true",
+            help="store the results as the new baseline")
+    parser.add_argument("--baseline", default=BASELINE_FILE,
+            help="baseline file to compare with")
+    parser.add_argument("--max-slowdown", type=float, default=1.25,
+            help="fail when a benchmark is this many times slower than the baseline")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.benchmarks)
+
+    with open(RESULTS_FILE, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.max_slowdown)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than baseline: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
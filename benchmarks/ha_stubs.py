@@ -0,0 +1,254 @@
+"""Lightweight stand-ins for the parts of Home Assistant used by rfidpad.
+
+install() registers fake homeassistant modules in sys.modules, so the
+custom component can be imported and exercised without a Home Assistant
+installation. The stand-ins only do as much as the benchmarks need.
+"""
+import asyncio
+from collections import namedtuple
+from datetime import datetime, timezone
+import importlib
+import sys
+import types
+
+
+class FakeBus:
+    """Event bus that only counts fired events."""
+
+    def __init__(self):
+        self.fired = 0
+
+    def fire(self, event_type, event_data=None):
+        self.fired += 1
+
+
+class FakeConfig:
+    def __init__(self):
+        self.components = {"mqtt"}
+
+
+FakeMessage = namedtuple("FakeMessage", ["topic", "payload"])
+
+
+class FakeConfigEntry:
+    def __init__(self, entry_id, data, version=2):
+        self.entry_id = entry_id
+        self.data = data
+        self.version = version
+
+
+class FakeConfigEntries:
+    """Sets up platforms of the component like Home Assistant does."""
+
+    def __init__(self, hass):
+        self.hass = hass
+
+    async def async_forward_entry_setup(self, entry, platform):
+        module = importlib.import_module(f"custom_components.rfidpad.{platform}")
+        await module.async_setup_entry(self.hass, entry, lambda devices: None)
+        return True
+
+    async def async_forward_entry_unload(self, entry, platform):
+        return True
+
+
+class FakeServices:
+    def async_register(self, domain, service, service_func, schema=None):
+        pass
+
+
+class FakeHass:
+    """Stand-in for HomeAssistant with data, bus and config."""
+
+    def __init__(self):
+        self.data = {}
+        self.bus = FakeBus()
+        self.config = FakeConfig()
+        self.config_entries = FakeConfigEntries(self)
+        self.services = FakeServices()
+        self.tasks = []
+
+    def async_add_job(self, target, *args):
+        pass
+
+    async def async_add_executor_job(self, target, *args):
+        return target(*args)
+
+    def async_create_task(self, target):
+        task = asyncio.get_event_loop().create_task(target)
+        self.tasks.append(task)
+        return task
+
+
+class FakeStore:
+    """Stand-in for helpers.storage.Store that never touches the disk."""
+
+    def __init__(self, hass, version, key, *args, **kwargs):
+        self.hass = hass
+        self.version = version
+        self.key = key
+        self.data = None
+        self.scheduled = 0
+
+    async def async_load(self):
+        return self.data
+
+    async def async_save(self, data):
+        self.data = data
+
+    def async_delay_save(self, data_func, delay=0):
+        self.scheduled += 1
+
+
+class FakeMqtt:
+    """Records subscriptions and counts published messages."""
+
+    def __init__(self):
+        self.subscriptions = {}
+        self.published = 0
+
+    async def async_subscribe(self, hass, topic, msg_callback, qos=0, encoding="utf-8"):
+        self.subscriptions[topic] = msg_callback
+        return lambda: self.subscriptions.pop(topic, None)
+
+    def async_publish(self, hass, topic, payload, qos=None, retain=None):
+        self.published += 1
+
+
+class FakeEntity:
+    """Stand-in for helpers.entity.Entity."""
+
+    hass = None
+
+    async def async_update_ha_state(self, force_refresh=False):
+        # Mimic the work Home Assistant does when writing a state
+        self.state
+        self.device_state_attributes
+
+
+class FakeConfigFlow:
+    def __init_subclass__(cls, domain=None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.DOMAIN = domain
+
+
+class FakeHandlers(dict):
+    def register(self, domain):
+        def decorator(cls):
+            self[domain] = cls
+            return cls
+        return decorator
+
+
+def _dispatcher_connect(hass, signal, target):
+    targets = hass.data.setdefault("dispatcher", {}).setdefault(signal, [])
+    targets.append(target)
+    return lambda: targets.remove(target)
+
+
+def _dispatcher_send(hass, signal, *args):
+    for target in hass.data.get("dispatcher", {}).get(signal, []):
+        target(*args)
+
+
+def _websocket_command(schema):
+    return _identity
+
+
+def _event_message(iden, event):
+    return {"id": iden, "type": "event", "event": event}
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _as_timestamp(dt_value):
+    return dt_value.timestamp()
+
+
+def _identity(value):
+    return value
+
+
+def _matches_regex(regex):
+    return _identity
+
+
+mqtt = FakeMqtt()
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def install():
+    """Register the fake homeassistant modules in sys.modules."""
+    if "homeassistant" in sys.modules and getattr(sys.modules["homeassistant"], "IS_STUB", False):
+        return
+
+    mqtt_module = _module(
+        "homeassistant.components.mqtt",
+        async_subscribe=mqtt.async_subscribe,
+        async_publish=mqtt.async_publish,
+    )
+    websocket_api = _module(
+        "homeassistant.components.websocket_api",
+        websocket_command=_websocket_command,
+        async_register_command=lambda hass, handler: None,
+        event_message=_event_message,
+    )
+    components = _module(
+        "homeassistant.components", mqtt=mqtt_module, websocket_api=websocket_api
+    )
+    config_entries = _module(
+        "homeassistant.config_entries",
+        ConfigEntry=object,
+        ConfigFlow=FakeConfigFlow,
+        OptionsFlow=object,
+        HANDLERS=FakeHandlers(),
+    )
+    _module(
+        "homeassistant.const",
+        CONF_NAME="name",
+        ATTR_VOLTAGE="voltage",
+        DEVICE_CLASS_BATTERY="battery",
+        PERCENTAGE="%",
+    )
+    _module(
+        "homeassistant.core",
+        Config=FakeConfig,
+        HomeAssistant=FakeHass,
+        callback=_identity,
+    )
+    _module("homeassistant.exceptions", ConfigEntryNotReady=Exception)
+    helpers = _module("homeassistant.helpers")
+    helpers.config_validation = _module(
+        "homeassistant.helpers.config_validation",
+        string=str,
+        matches_regex=_matches_regex,
+    )
+    helpers.dispatcher = _module(
+        "homeassistant.helpers.dispatcher",
+        async_dispatcher_connect=_dispatcher_connect,
+        async_dispatcher_send=_dispatcher_send,
+    )
+    helpers.entity = _module("homeassistant.helpers.entity", Entity=FakeEntity)
+    helpers.storage = _module("homeassistant.helpers.storage", Store=FakeStore)
+    helpers.typing = _module(
+        "homeassistant.helpers.typing", ConfigType=dict, HomeAssistantType=FakeHass
+    )
+    util = _module("homeassistant.util")
+    util.dt = _module("homeassistant.util.dt", now=_now, as_timestamp=_as_timestamp)
+
+    _module(
+        "homeassistant",
+        IS_STUB=True,
+        components=components,
+        config_entries=config_entries,
+        helpers=helpers,
+        util=util,
+    )
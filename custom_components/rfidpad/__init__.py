@@ -8,6 +8,7 @@ import asyncio
 from datetime import timedelta
 import json
 import logging
+import time
 
 import voluptuous as vol
 from homeassistant.components import mqtt, websocket_api
@@ -15,6 +16,10 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import Config, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.dispatcher import (
+    async_dispatcher_connect,
+    async_dispatcher_send,
+)
 from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType, HomeAssistantType
 import homeassistant.util.dt as dt_util
@@ -41,12 +46,16 @@ from .const import (
     DEVICE_CONF_ACTION_TOPIC,
     DEVICE_CONF_STATUS_TOPIC,
     DEVICE_CONF_BATTERY_TOPIC,
+    DEVICE_CONF_ENCODING,
+    ENCODINGS,
+    ENCODING_MSGPACK,
     DEFAULT_MODEL,
     DEFAULT_MANUFACTURER,
     DEFAULT_SW_VERSION,
     DEFAULT_STATUS_TOPIC,
     DEFAULT_ACTION_TOPIC,
     DEFAULT_BATTERY_TOPIC,
+    DEFAULT_ENCODING,
     STATUS_TRANSITIONS,
     STORAGE_KEY,
     STORAGE_VERSION,
@@ -54,10 +63,13 @@ from .const import (
     MAX_HISTORY,
     HISTORY_UPDATED_EVENT,
     TAG_SCANNED_EVENT,
+    SIGNAL_ACTION,
+    WS_TYPE_SUBSCRIBE_ACTIONS,
 )
 
-from .config_flow import RFIDPadConfigFlow
-from .sensor import BatterySensor, LastTagSensor
+from .payload import decode_payload, encode_payload, load_encoding, mqtt_encoding
+from .sensor import BatteryForecastSensor, BatterySensor, LastTagSensor
+from .telemetry import BatteryTelemetry
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -83,6 +95,8 @@ async def async_setup(hass: HomeAssistant, config: Config):
     hass.data[DOMAIN] = {}
     hass.data[DOMAIN][CONF_TAGS] = {}
 
+    websocket_api.async_register_command(hass, websocket_subscribe_actions)
+
     if DOMAIN not in config:
         _LOGGER.error(f"{DOMAIN} not configured in configuration.yaml, no tags will be recognized!")
         return True
@@ -117,11 +131,14 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
 
     mqtt_prefix = entry.data.get(CONF_MQTT_PREFIX)
     handler = RFIDPadHandler(hass, entry, mqtt_prefix)
-    await handler.async_initialize()
     hass.data[DOMAIN][entry.entry_id] = handler
 
+    # Subscribe to discovery right away; discovery messages are buffered by
+    # the handler until all platforms have been set up
+    await asyncio.gather(handler.async_initialize(), handler.start_discovery())
+
     for platform in PLATFORMS:
-        hass.async_add_job(
+        hass.async_create_task(
             hass.config_entries.async_forward_entry_setup(entry, platform)
         )
 
@@ -171,6 +188,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     handler = hass.data[DOMAIN].pop(entry.entry_id)
 
     _LOGGER.debug(f"Unloading RFIDPad for {handler.mqtt_prefix}")
+    handler.stop_discovery()
 
     unloaded = all(
         await asyncio.gather(
@@ -184,6 +202,55 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     return unloaded
 
 
+@websocket_api.websocket_command({
+    vol.Required("type"): WS_TYPE_SUBSCRIBE_ACTIONS,
+    vol.Optional("history", default=0): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_HISTORY)),
+    vol.Optional("pad"): cv.string,
+    vol.Optional("tag"): TAG_SCHEMA,
+})
+@callback
+def websocket_subscribe_actions(hass, connection, msg):
+    """Push each new action to the client, optionally filtered by pad or tag.
+
+    After the result, an event with the last `history` matching actions is
+    sent, followed by one event per new matching action.
+    """
+    handler = next(
+        (value for value in hass.data.get(DOMAIN, {}).values()
+            if isinstance(value, RFIDPadHandler)),
+        None
+    )
+    if handler is None:
+        connection.send_error(msg["id"], "not_found", "RFIDPad is not set up")
+        return
+
+    pad = msg.get("pad")
+    tag = msg.get("tag")
+    if tag is not None:
+        tag = tag.upper()
+
+    def matches(action):
+        return (pad is None or action["pad"] == pad) and (tag is None or action["tag"] == tag)
+
+    @callback
+    def forward_action(action):
+        if matches(action):
+            connection.send_message(
+                websocket_api.event_message(msg["id"], {"action": action})
+            )
+
+    connection.subscriptions[msg["id"]] = async_dispatcher_connect(
+        hass, SIGNAL_ACTION, forward_action
+    )
+    connection.send_result(msg["id"])
+
+    if msg["history"] > 0:
+        history = [action for action in handler._history if matches(action)]
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {"history": history[-msg["history"]:]})
+        )
+
+
 ##async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry):
 ##    """Reload config entry."""
 ##    await async_unload_entry(hass, entry)
@@ -198,6 +265,12 @@ class RFIDPadHandler:
         self.devices = {}
         self.store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
         self._history = []
+        self._battery_telemetry = {}
+        self._pending_discovery = {}
+        self._unsubscribe_discovery = None
+        self.platforms_ready = False
+        self.setup_started = time.monotonic()
+        self.setup_time = None
 
     async def async_initialize(self):
         try:
@@ -206,6 +279,14 @@ class RFIDPadHandler:
         except:
             self._history = []
 
+        try:
+            self._battery_telemetry = {
+                pad_id: BatteryTelemetry.from_dict(data)
+                for pad_id, data in raw_storage["battery"].items()
+            }
+        except:
+            self._battery_telemetry = {}
+
         _LOGGER.debug(f"Initial history: {self._history}")
 
 
@@ -219,17 +300,56 @@ class RFIDPadHandler:
         """Return history and tag data store in a file."""
         return {
             'history': self._history[-MAX_HISTORY:],
+            'battery': {
+                pad_id: telemetry.as_dict()
+                for pad_id, telemetry in self._battery_telemetry.items()
+            },
         }
 
+    def battery_telemetry(self, pad_id):
+        """Return the battery telemetry store of a pad, creating it if needed."""
+        if pad_id not in self._battery_telemetry:
+            self._battery_telemetry[pad_id] = BatteryTelemetry()
+        return self._battery_telemetry[pad_id]
+
 
     async def start_discovery(self):
         topic_filter = f"{self.mqtt_prefix}/discovery/#"
         _LOGGER.info(f"Subscribing to MQTT filter {topic_filter}")
-        await mqtt.async_subscribe(self.hass, f"{self.mqtt_prefix}/discovery/#", self.async_receive_discovery)
+        self._unsubscribe_discovery = await mqtt.async_subscribe(self.hass, topic_filter, self.async_receive_discovery)
+
+    @callback
+    def stop_discovery(self):
+        if self._unsubscribe_discovery is not None:
+            self._unsubscribe_discovery()
+            self._unsubscribe_discovery = None
+
+    async def async_platform_ready(self, platform, async_add_devices):
+        """Called by a platform once it can add entities.
+
+        When all platforms are ready, the buffered discovery messages are
+        handled.
+        """
+        self.async_add_devices[platform] = async_add_devices
+        if len(self.async_add_devices) < len(PLATFORMS):
+            _LOGGER.debug("Not all platforms initialised, buffering discovery messages")
+            return
+
+        self.platforms_ready = True
+        self.setup_time = time.monotonic() - self.setup_started
+        _LOGGER.info(f"RFIDPad setup took {self.setup_time:.3f}s, handling {len(self._pending_discovery)} buffered discovery messages")
+
+        pending = self._pending_discovery
+        self._pending_discovery = {}
+        for msg in pending.values():
+            await self.async_receive_discovery(msg)
 
     async def async_receive_discovery(self, msg):
         _LOGGER.info(f"Received discovery message: {msg} ({type(msg)})")
-        async_add_devices_sensor = self.async_add_devices[SENSOR]
+        if not self.platforms_ready:
+            # Only the last message per pad matters
+            self._pending_discovery[msg.topic] = msg
+            return
 
         try:
             config = json.loads(msg.payload)
@@ -248,9 +368,11 @@ class RFIDPadHandler:
     async def async_handle_action(self, action):
         """ Called by an RFIDPad when a tag has been scanned """
 
-        self._history.append(action.as_dict())
+        action_dict = action.as_dict()
+        self._history.append(action_dict)
         _LOGGER.debug(f"Current history: {self._history}")
         self.hass.bus.fire(HISTORY_UPDATED_EVENT, {})
+        async_dispatcher_send(self.hass, SIGNAL_ACTION, action_dict)
         self._async_schedule_save()
 
         if not action.tag_valid:
@@ -341,8 +463,17 @@ class RFIDPad:
         except:
             self.battery_topic = f"{self.base_topic}/{DEFAULT_BATTERY_TOPIC}" 
 
+        self.encoding = config.get(DEVICE_CONF_ENCODING, DEFAULT_ENCODING)
+        if self.encoding not in ENCODINGS:
+            _LOGGER.warning(f"RFIDPad {self.id} advertises unknown encoding {self.encoding}, using {DEFAULT_ENCODING}")
+            self.encoding = DEFAULT_ENCODING
+
         self.battery_level = None
         self.battery_voltage = None
+        self.battery_telemetry = handler.battery_telemetry(self.id)
+        # Forecast from the telemetry restored at startup, so the sensor has a
+        # value before the pad next wakes up
+        self.days_until_empty = self._forecast_days()
 
         self.last_action = None
 
@@ -350,21 +481,25 @@ class RFIDPad:
         _LOGGER.info(f"Subscribing to rfidpad action: {self.action_topic}")
 
         self.battery_sensor = BatterySensor(self.hass, self)
+        self.battery_forecast_sensor = BatteryForecastSensor(self.hass, self)
         self.last_tag_sensor = LastTagSensor(self.hass, self)
-        new_devices = [self.battery_sensor, self.last_tag_sensor]
+        new_devices = [self.battery_sensor, self.battery_forecast_sensor, self.last_tag_sensor]
 
         _LOGGER.info(f"Adding {len(new_devices)} entities")
         self.handler.async_add_devices[SENSOR](new_devices)
 
-        await mqtt.async_subscribe(self.hass, self.action_topic, self.async_receive_action)
-        await mqtt.async_subscribe(self.hass, self.battery_topic, self.async_receive_battery)
+        if self.encoding == ENCODING_MSGPACK:
+            await self.hass.async_add_executor_job(load_encoding, self.encoding)
+        encoding = mqtt_encoding(self.encoding)
+        await mqtt.async_subscribe(self.hass, self.action_topic, self.async_receive_action, encoding=encoding)
+        await mqtt.async_subscribe(self.hass, self.battery_topic, self.async_receive_battery, encoding=encoding)
 
     async def async_receive_action(self, msg):
         _LOGGER.info(f"Received action message: {msg}")
         try:
-            message = json.loads(msg.payload)
+            message = decode_payload(msg.payload, self.encoding)
         except:
-            _LOGGER.info(f"Cannot parse rfidpad battery message: {msg.payload}")
+            _LOGGER.info(f"Cannot parse rfidpad action message: {msg.payload}")
             return
 
         try:
@@ -381,14 +516,47 @@ class RFIDPad:
 
         await self.last_tag_sensor.async_update_ha_state()
 
+    def _forecast_days(self):
+        """Return the battery forecast in whole days, or None.
+
+        Whole days, so the forecast sensor only changes a few times a day.
+        """
+        days_until_empty = self.battery_telemetry.days_until_empty()
+        if days_until_empty is not None:
+            days_until_empty = round(days_until_empty)
+        return days_until_empty
+
     async def async_receive_battery(self, msg):
         _LOGGER.info(f"Received battery message: {msg}")
         try:
-            message = json.loads(msg.payload)
+            message = decode_payload(msg.payload, self.encoding)
         except:
             _LOGGER.info(f"Cannot parse rfidpad battery message: {msg.payload}")
-        self.battery_level = message["level"]
-        self.battery_voltage = message["voltage"]
+            return
+
+        try:
+            level = message["level"]
+            voltage = float(message["voltage"])
+        except:
+            _LOGGER.info(f"Battery message from board does not contain valid 'level' and 'voltage' tags: {msg.payload}")
+            return
+
+        self.battery_telemetry.add_sample(dt_util.as_timestamp(dt_util.now()), voltage)
+        self.handler._async_schedule_save()
+
+        days_until_empty = self._forecast_days()
+        if days_until_empty != self.days_until_empty:
+            self.days_until_empty = days_until_empty
+            await self.battery_forecast_sensor.async_update_ha_state()
+
+        # Only write a new state when the reading changed meaningfully, to
+        # keep the recorder database small
+        if not self.battery_telemetry.should_record(voltage):
+            _LOGGER.debug(f"Battery reading of {self.id} unchanged, not updating state")
+            return
+
+        self.battery_level = level
+        self.battery_voltage = voltage
 
         await self.battery_sensor.async_update_ha_state()
 
@@ -396,6 +564,6 @@ class RFIDPad:
         message = {
             "new_status": new_status
         }
-        msg = json.dumps(message)
+        msg = encode_payload(message, self.encoding)
         _LOGGER.debug(f"Publishing {msg} to {self.status_topic}")
         mqtt.async_publish(self.hass, self.status_topic, msg, retain=True)
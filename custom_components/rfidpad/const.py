@@ -28,9 +28,24 @@ STORAGE_VERSION = 1
 SAVE_DELAY = 10
 MAX_HISTORY = 99
 
+# Battery telemetry
+BATTERY_BUCKET_SECONDS = 6 * 60 * 60
+BATTERY_BUCKETS = 120
+# Only record a new battery state when the voltage changed at least this much
+BATTERY_VOLTAGE_THRESHOLD = 0.02
+# A voltage rise of at least this much means the battery has been recharged
+BATTERY_RECHARGE_THRESHOLD = 0.1
+# Voltage at which the firmware reports 0%
+BATTERY_EMPTY_VOLTAGE = 3.686
+
 HISTORY_UPDATED_EVENT = "{}.history_updated".format(DOMAIN)
 TAG_SCANNED_EVENT = "{}.tag_scanned".format(DOMAIN)
 
+# Dispatcher signal sent with the dict of each new RFIDAction
+SIGNAL_ACTION = "{}_action".format(DOMAIN)
+
+WS_TYPE_SUBSCRIBE_ACTIONS = "{}/subscribe_actions".format(DOMAIN)
+
 # Configuration and options
 CONF_MQTT_PREFIX = "mqtt_prefix"
 CONF_TAGS = "tags"
@@ -45,6 +60,12 @@ DEVICE_CONF_BASE_TOPIC = "base_topic"
 DEVICE_CONF_ACTION_TOPIC = "action_topic"
 DEVICE_CONF_STATUS_TOPIC = "status_topic"
 DEVICE_CONF_BATTERY_TOPIC = "battery_topic"
+DEVICE_CONF_ENCODING = "encoding"
+
+# Payload encodings a pad can advertise in its discovery message
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+ENCODINGS = [ENCODING_JSON, ENCODING_MSGPACK]
 
 STATUS_TRANSITIONS = {
     'DISARM': 'DISARMED',
@@ -67,6 +88,7 @@ DEFAULT_SW_VERSION = "0.0.1"
 DEFAULT_STATUS_TOPIC = "status"
 DEFAULT_ACTION_TOPIC = "action"
 DEFAULT_BATTERY_TOPIC = "battery"
+DEFAULT_ENCODING = ENCODING_JSON
 
 
 STARTUP_MESSAGE = f"""
@@ -0,0 +1,42 @@
+"""Encoding and decoding of the MQTT payloads exchanged with RFIDPads."""
+import json
+
+from .const import ENCODING_MSGPACK
+
+
+def load_encoding(encoding):
+    """Import the module needed for an encoding ahead of its first use.
+
+    This does blocking I/O the first time, so run it in the executor. The
+    codec functions import the module themselves as well, so they also work
+    before this has run; msgpack is only imported once a pad advertises it.
+    """
+    if encoding == ENCODING_MSGPACK:
+        import msgpack
+
+
+def decode_payload(payload, encoding):
+    """Decode a payload received from a pad using the given encoding."""
+    if encoding == ENCODING_MSGPACK:
+        import msgpack
+        return msgpack.unpackb(payload, raw=False)
+    return json.loads(payload)
+
+
+def encode_payload(message, encoding):
+    """Encode a message for a pad using the given encoding."""
+    if encoding == ENCODING_MSGPACK:
+        import msgpack
+        return msgpack.packb(message, use_bin_type=True)
+    return json.dumps(message)
+
+
+def mqtt_encoding(encoding):
+    """Return the encoding to pass to mqtt.async_subscribe.
+
+    Binary encodings need the raw bytes, so the payload must not be decoded
+    as UTF-8 by the MQTT integration.
+    """
+    if encoding == ENCODING_MSGPACK:
+        return None
+    return "utf-8"
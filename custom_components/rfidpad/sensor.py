@@ -4,7 +4,13 @@ import logging
 from homeassistant.const import ATTR_VOLTAGE, DEVICE_CLASS_BATTERY, PERCENTAGE
 from homeassistant.helpers.entity import Entity
 
-from .const import DOMAIN, SENSOR, PLATFORMS, ATTR_TAG_NAME, ATTR_BUTTON, ATTR_HISTORY
+from .const import (
+    DOMAIN,
+    SENSOR,
+    ATTR_TAG_NAME,
+    ATTR_BUTTON,
+    ATTR_HISTORY,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -18,13 +24,7 @@ async def async_setup_entry(hass, config_entry, async_add_devices):
     handler = hass.data[DOMAIN][config_entry.entry_id]
     _LOGGER.info(f"async_setup_entry() for RFIDPadSensor: {config_entry.data}")
 
-    handler.async_add_devices[SENSOR] = async_add_devices
-
-    if len(handler.async_add_devices) < len(PLATFORMS):
-        _LOGGER.debug("Not all platforms initialised, not starting discovery!")
-        return
-
-    await handler.start_discovery()
+    await handler.async_platform_ready(SENSOR, async_add_devices)
 
 class BatterySensor(Entity):
     """Representation of a Sensor."""
@@ -82,6 +82,48 @@ class BatterySensor(Entity):
 
         return attr
 
+class BatteryForecastSensor(Entity):
+    """Estimated number of days until the battery of an RFIDPad is empty."""
+
+    def __init__(self, hass, device):
+        """Initialize the sensor."""
+        self.hass = hass
+        self._device = device
+
+    @property
+    def unique_id(self):
+        return f"{DOMAIN}_{self._device.id}_bat_forecast"
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return f"{self._device.name} Battery Empty In"
+
+    @property
+    def device_info(self):
+        return {
+            "identifiers": {(DOMAIN, self._device.id)},
+        }
+
+    @property
+    def icon(self):
+        return "mdi:battery-clock"
+
+    @property
+    def state(self):
+        """Return the state of the sensor."""
+        return self._device.days_until_empty
+
+    @property
+    def should_poll(self):
+        """No need to poll, updated when rfidpad reports its battery."""
+        return False
+
+    @property
+    def unit_of_measurement(self):
+        """Return the unit of measurement."""
+        return "d"
+
 class LastTagSensor(Entity):
     """Representation of the last scanned tag by an RFIDPad."""
 
@@ -0,0 +1,140 @@
+"""Battery telemetry for RFIDPads."""
+from array import array
+
+from .const import (
+    BATTERY_BUCKET_SECONDS,
+    BATTERY_BUCKETS,
+    BATTERY_EMPTY_VOLTAGE,
+    BATTERY_RECHARGE_THRESHOLD,
+    BATTERY_VOLTAGE_THRESHOLD,
+)
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+class BatteryTelemetry:
+    """Downsampled battery voltage readings of a single pad.
+
+    Voltage samples are averaged into fixed-size time buckets, kept in a ring
+    of at most num_buckets entries. A least squares fit over the bucket
+    averages gives the discharge trend used to forecast when the battery
+    will be empty. When a sample shows the battery has been recharged, the
+    older buckets are dropped so they don't distort the trend.
+    """
+
+    def __init__(self, bucket_seconds=BATTERY_BUCKET_SECONDS,
+            num_buckets=BATTERY_BUCKETS):
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = num_buckets
+        # Start time of each bucket, average voltage and number of samples
+        self._starts = array('d')
+        self._voltages = array('d')
+        self._counts = array('L')
+        # Index of the most recent bucket in the ring
+        self._last = -1
+        self.recorded_voltage = None
+
+    def __len__(self):
+        return len(self._starts)
+
+    def clear(self):
+        """Drop all buckets."""
+        del self._starts[:]
+        del self._voltages[:]
+        del self._counts[:]
+        self._last = -1
+
+    def add_sample(self, timestamp, voltage):
+        """Add a voltage sample taken at the given unix timestamp."""
+        start = timestamp - timestamp % self.bucket_seconds
+        last = self._last
+        if last >= 0 and voltage - self._voltages[last] >= BATTERY_RECHARGE_THRESHOLD:
+            # Recharged; readings from before the recharge no longer apply
+            self.clear()
+            last = -1
+
+        if last >= 0 and self._starts[last] == start:
+            count = self._counts[last] + 1
+            self._voltages[last] += (voltage - self._voltages[last]) / count
+            self._counts[last] = count
+            return
+
+        if len(self._starts) < self.num_buckets:
+            self._starts.append(start)
+            self._voltages.append(voltage)
+            self._counts.append(1)
+            self._last = len(self._starts) - 1
+        else:
+            self._last = (last + 1) % self.num_buckets
+            self._starts[self._last] = start
+            self._voltages[self._last] = voltage
+            self._counts[self._last] = 1
+
+    def should_record(self, voltage):
+        """Return True if a voltage differs enough from the last recorded one.
+
+        Only the voltage is compared: the level reported by the firmware
+        changes by 1% every 5 mV, which is within the noise of the ADC.
+        When True, the voltage is remembered as the last recorded one.
+        """
+        if (self.recorded_voltage is None
+                or abs(voltage - self.recorded_voltage) >= BATTERY_VOLTAGE_THRESHOLD):
+            self.recorded_voltage = voltage
+            return True
+        return False
+
+    def discharge_rate(self):
+        """Return the fitted voltage change per second, or None."""
+        n = len(self._starts)
+        if n < 2:
+            return None
+
+        # Use times relative to the first bucket to keep the sums small
+        t0 = min(self._starts)
+        mean_t = sum(start - t0 for start in self._starts) / n
+        mean_v = sum(self._voltages) / n
+        cov = 0.0
+        var = 0.0
+        for start, voltage in zip(self._starts, self._voltages):
+            dt = start - t0 - mean_t
+            cov += dt * (voltage - mean_v)
+            var += dt * dt
+        if var == 0:
+            return None
+        return cov / var
+
+    def days_until_empty(self, empty_voltage=BATTERY_EMPTY_VOLTAGE):
+        """Return the estimated number of days until the battery is empty.
+
+        Returns None when there is not enough data or the battery is not
+        discharging.
+        """
+        rate = self.discharge_rate()
+        if rate is None or rate >= 0:
+            return None
+        remaining = self._voltages[self._last] - empty_voltage
+        if remaining <= 0:
+            return 0.0
+        return round(remaining / -rate / SECONDS_PER_DAY, 1)
+
+    def as_dict(self):
+        """Return the buckets in chronological order, for storage."""
+        order = [(self._last + 1 + i) % len(self._starts) for i in range(len(self._starts))]
+        return {
+            "starts": [self._starts[i] for i in order],
+            "voltages": [self._voltages[i] for i in order],
+            "counts": [self._counts[i] for i in order],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore telemetry stored with as_dict()."""
+        telemetry = cls()
+        for start, voltage, count in zip(data["starts"][-telemetry.num_buckets:],
+                data["voltages"][-telemetry.num_buckets:],
+                data["counts"][-telemetry.num_buckets:]):
+            telemetry._starts.append(start)
+            telemetry._voltages.append(voltage)
+            telemetry._counts.append(count)
+        telemetry._last = len(telemetry._starts) - 1
+        return telemetry
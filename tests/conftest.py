@@ -0,0 +1,11 @@
+"""Make the custom component importable with the Home Assistant stand-ins."""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmarks"))
+
+import ha_stubs
+
+ha_stubs.install()
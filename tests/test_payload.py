@@ -0,0 +1,67 @@
+"""Tests for the payload encodings of RFIDPads."""
+import logging
+import sys
+
+import ha_stubs
+
+from custom_components import rfidpad
+from custom_components.rfidpad.const import (
+    CONF_TAGS,
+    DOMAIN,
+    ENCODING_JSON,
+    ENCODING_MSGPACK,
+)
+from custom_components.rfidpad.payload import (
+    decode_payload,
+    encode_payload,
+    mqtt_encoding,
+)
+
+
+def make_pad(config):
+    hass = ha_stubs.FakeHass()
+    hass.data[DOMAIN] = {CONF_TAGS: {}}
+    handler = rfidpad.RFIDPadHandler(hass, None, "rfidpad")
+    return rfidpad.RFIDPad(hass, handler, config)
+
+
+def test_msgpack_round_trip():
+    message = {"button": "ARM_AWAY", "tag": "ABCD0145"}
+    payload = encode_payload(message, ENCODING_MSGPACK)
+    assert isinstance(payload, bytes)
+    assert len(payload) < len(encode_payload(message, ENCODING_JSON))
+    assert decode_payload(payload, ENCODING_MSGPACK) == message
+
+
+def test_json_round_trip():
+    message = {"new_status": "DISARMED"}
+    payload = encode_payload(message, ENCODING_JSON)
+    assert isinstance(payload, str)
+    assert decode_payload(payload, ENCODING_JSON) == message
+
+
+def test_msgpack_without_load_encoding(monkeypatch):
+    # A status update can reach a new msgpack pad before its start() has
+    # preloaded msgpack in the executor
+    monkeypatch.delitem(sys.modules, "msgpack", raising=False)
+    assert isinstance(encode_payload({"new_status": "DISARMED"}, ENCODING_MSGPACK), bytes)
+
+
+def test_discovery_encoding():
+    pad = make_pad({"id": "pad0", "name": "Pad", "encoding": "msgpack"})
+    assert pad.encoding == ENCODING_MSGPACK
+
+    pad = make_pad({"id": "pad0", "name": "Pad"})
+    assert pad.encoding == ENCODING_JSON
+
+
+def test_unknown_encoding_falls_back_to_json(caplog):
+    with caplog.at_level(logging.WARNING):
+        pad = make_pad({"id": "pad0", "name": "Pad", "encoding": "cbor"})
+    assert pad.encoding == ENCODING_JSON
+    assert "unknown encoding cbor" in caplog.text
+
+
+def test_mqtt_encoding():
+    assert mqtt_encoding(ENCODING_MSGPACK) is None
+    assert mqtt_encoding(ENCODING_JSON) == "utf-8"
@@ -0,0 +1,106 @@
+"""Tests for the RFIDPad handler and pads."""
+import asyncio
+import json
+
+import ha_stubs
+
+from custom_components import rfidpad
+from custom_components.rfidpad.const import CONF_TAGS, DOMAIN
+from custom_components.rfidpad.sensor import (
+    BatteryForecastSensor,
+    BatterySensor,
+    LastTagSensor,
+)
+from custom_components.rfidpad.telemetry import SECONDS_PER_DAY
+
+TAGS = {"0000000A": "Mary", "0000000B": "John"}
+
+
+def make_handler():
+    hass = ha_stubs.FakeHass()
+    hass.data[DOMAIN] = {CONF_TAGS: TAGS}
+    handler = rfidpad.RFIDPadHandler(hass, None, "rfidpad")
+    return handler
+
+
+def make_pad(handler, pad_id="pad0", **config):
+    pad = rfidpad.RFIDPad(handler.hass, handler, dict(id=pad_id, name=pad_id, **config))
+    pad.battery_sensor = BatterySensor(handler.hass, pad)
+    pad.battery_forecast_sensor = BatteryForecastSensor(handler.hass, pad)
+    pad.last_tag_sensor = LastTagSensor(handler.hass, pad)
+    handler.devices[pad.id] = pad
+    return pad
+
+
+def test_forecast_restored_at_startup():
+    handler = make_handler()
+    telemetry = handler.battery_telemetry("pad0")
+    for day in range(10):
+        telemetry.add_sample(day * SECONDS_PER_DAY, 4.2 - 0.015 * day)
+    pad = make_pad(handler)
+    assert pad.days_until_empty == round(telemetry.days_until_empty())
+
+
+def test_battery_voltage_is_coerced():
+    handler = make_handler()
+    pad = make_pad(handler)
+    payload = json.dumps({"level": 80, "voltage": "4.1"})
+    asyncio.run(pad.async_receive_battery(ha_stubs.FakeMessage("battery", payload)))
+    assert pad.battery_voltage == 4.1
+
+
+def test_battery_voltage_invalid_is_ignored():
+    handler = make_handler()
+    pad = make_pad(handler)
+    payload = json.dumps({"level": 80, "voltage": "high"})
+    asyncio.run(pad.async_receive_battery(ha_stubs.FakeMessage("battery", payload)))
+    assert pad.battery_voltage is None
+    assert len(pad.battery_telemetry) == 0
+
+
+def discovery_message(pad_id, name):
+    return ha_stubs.FakeMessage(
+        f"rfidpad/discovery/{pad_id}", json.dumps({"id": pad_id, "name": name})
+    )
+
+
+def test_discovery_buffered_until_platforms_ready():
+    async def run():
+        hass = ha_stubs.FakeHass()
+        hass.data[DOMAIN] = {CONF_TAGS: TAGS}
+        entry = ha_stubs.FakeConfigEntry("entry", {"mqtt_prefix": "rfidpad"})
+        handler = rfidpad.RFIDPadHandler(hass, entry, "rfidpad")
+        await handler.start_discovery()
+        receive_discovery = ha_stubs.mqtt.subscriptions["rfidpad/discovery/#"]
+
+        await receive_discovery(discovery_message("pad0", "Old name"))
+        await receive_discovery(discovery_message("pad0", "Front"))
+        await receive_discovery(discovery_message("pad1", "Back"))
+        assert handler.devices == {}
+
+        added = []
+        await handler.async_platform_ready("sensor", added.extend)
+        return handler, added
+
+    handler, added = asyncio.run(run())
+    assert handler.setup_time is not None
+    # Only the last message per topic is replayed
+    assert {pad.id: pad.name for pad in handler.devices.values()} == {
+        "pad0": "Front",
+        "pad1": "Back",
+    }
+    assert len(added) == 2 * 3
+
+
+def test_unload_stops_discovery():
+    async def run():
+        hass = ha_stubs.FakeHass()
+        hass.data[DOMAIN] = {CONF_TAGS: TAGS}
+        entry = ha_stubs.FakeConfigEntry("entry", {"mqtt_prefix": "rfidpad"})
+        await rfidpad.async_setup_entry(hass, entry)
+        await asyncio.gather(*hass.tasks)
+        assert "rfidpad/discovery/#" in ha_stubs.mqtt.subscriptions
+        await rfidpad.async_unload_entry(hass, entry)
+
+    asyncio.run(run())
+    assert "rfidpad/discovery/#" not in ha_stubs.mqtt.subscriptions
@@ -0,0 +1,61 @@
+"""Tests for the battery telemetry of RFIDPads."""
+from custom_components.rfidpad.const import BATTERY_EMPTY_VOLTAGE
+from custom_components.rfidpad.telemetry import SECONDS_PER_DAY, BatteryTelemetry
+
+RATE = 0.015  # V per day
+SAMPLE_INTERVAL = 2 * 60 * 60
+
+
+def discharge(telemetry, start_time, start_voltage, days):
+    """Add a sample every two hours of a battery losing RATE per day."""
+    for i in range(int(days * SECONDS_PER_DAY / SAMPLE_INTERVAL) + 1):
+        elapsed = i * SAMPLE_INTERVAL
+        telemetry.add_sample(start_time + elapsed,
+                start_voltage - RATE * elapsed / SECONDS_PER_DAY)
+    return start_time + days * SECONDS_PER_DAY
+
+
+def expected_days(voltage):
+    return (voltage - BATTERY_EMPTY_VOLTAGE) / RATE
+
+
+def test_days_until_empty():
+    telemetry = BatteryTelemetry()
+    discharge(telemetry, 0, 4.2, 10)
+    assert abs(telemetry.days_until_empty() - expected_days(4.2 - 10 * RATE)) < 1
+
+
+def test_days_until_empty_after_recharge():
+    telemetry = BatteryTelemetry()
+    now = discharge(telemetry, 0, 4.2, 20)
+    assert abs(telemetry.days_until_empty() - expected_days(4.2 - 20 * RATE)) < 1
+
+    now = discharge(telemetry, now + SAMPLE_INTERVAL, 4.2, 2)
+    assert abs(telemetry.days_until_empty() - expected_days(4.2 - 2 * RATE)) < 1
+
+    discharge(telemetry, now + SAMPLE_INTERVAL, 4.2 - 2 * RATE, 5)
+    assert abs(telemetry.days_until_empty() - expected_days(4.2 - 7 * RATE)) < 1
+
+
+def test_not_discharging():
+    telemetry = BatteryTelemetry()
+    assert telemetry.days_until_empty() is None
+    telemetry.add_sample(0, 4.0)
+    telemetry.add_sample(SECONDS_PER_DAY, 4.0)
+    assert telemetry.days_until_empty() is None
+
+
+def test_should_record_ignores_noise():
+    telemetry = BatteryTelemetry()
+    assert telemetry.should_record(4.000)
+    assert not telemetry.should_record(4.005)
+    assert not telemetry.should_record(3.990)
+    assert telemetry.should_record(3.975)
+    assert not telemetry.should_record(3.980)
+
+
+def test_storage_round_trip():
+    telemetry = BatteryTelemetry(num_buckets=10)
+    discharge(telemetry, 0, 4.2, 5)
+    restored = BatteryTelemetry.from_dict(telemetry.as_dict())
+    assert restored.days_until_empty() == telemetry.days_until_empty()
@@ -0,0 +1,88 @@
+"""Tests for the rfidpad websocket API."""
+import asyncio
+
+import ha_stubs
+
+from custom_components import rfidpad
+from custom_components.rfidpad.const import CONF_TAGS, DOMAIN
+
+TAGS = {"0000000A": "Mary", "0000000B": "John"}
+
+
+class FakeConnection:
+    def __init__(self):
+        self.subscriptions = {}
+        self.messages = []
+
+    def send_message(self, message):
+        self.messages.append(message)
+
+    def send_result(self, iden, result=None):
+        self.messages.append({"id": iden, "type": "result", "result": result})
+
+    def send_error(self, iden, code, message):
+        self.messages.append({"id": iden, "type": "error", "code": code})
+
+    def events(self, key):
+        return [m["event"][key] for m in self.messages
+                if m["type"] == "event" and key in m["event"]]
+
+
+def make_handler():
+    hass = ha_stubs.FakeHass()
+    hass.data[DOMAIN] = {CONF_TAGS: TAGS}
+    handler = rfidpad.RFIDPadHandler(hass, None, "rfidpad")
+    hass.data[DOMAIN]["entry"] = handler
+    pads = {}
+    for name in ("Front", "Back"):
+        pad = rfidpad.RFIDPad(hass, handler, {"id": name.lower(), "name": name})
+        handler.devices[pad.id] = pad
+        pads[name] = pad
+    return handler, pads
+
+
+def scan(handler, pad, tag):
+    asyncio.run(handler.async_handle_action(rfidpad.RFIDAction(pad, "SCAN", tag)))
+
+
+def subscribe(handler, **msg):
+    connection = FakeConnection()
+    rfidpad.websocket_subscribe_actions(
+        handler.hass, connection, dict({"id": 1, "history": 0}, **msg)
+    )
+    return connection
+
+
+def test_history_snapshot_is_trimmed():
+    handler, pads = make_handler()
+    for _ in range(5):
+        scan(handler, pads["Front"], "0000000A")
+    connection = subscribe(handler, history=3)
+    assert connection.messages[0]["type"] == "result"
+    history = connection.events("history")
+    assert len(history) == 1
+    assert len(history[0]) == 3
+
+
+def test_filters_drop_other_scans():
+    handler, pads = make_handler()
+    scan(handler, pads["Back"], "0000000A")
+    connection = subscribe(handler, pad="Front", tag="0000000a", history=10)
+    assert connection.events("history") == [[]]
+
+    scan(handler, pads["Front"], "0000000A")
+    scan(handler, pads["Front"], "0000000B")
+    scan(handler, pads["Back"], "0000000A")
+    actions = connection.events("action")
+    assert [(a["pad"], a["tag"]) for a in actions] == [("Front", "0000000A")]
+
+
+def test_unsubscribe_stops_delivery():
+    handler, pads = make_handler()
+    connection = subscribe(handler)
+    scan(handler, pads["Front"], "0000000A")
+    assert len(connection.events("action")) == 1
+
+    connection.subscriptions[1]()
+    scan(handler, pads["Front"], "0000000A")
+    assert len(connection.events("action")) == 1